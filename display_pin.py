@@ -28,11 +28,21 @@
 
 ### TODO - apply restictions on font size based on width, e.g. height=36, width=120
 
+import array
+
 import displayio
 import terminalio
 
 import adafruit_display_text.label
 
+try:
+    import bitmaptools
+except ImportError:
+    bitmaptools = None  ### Not present on older CircuitPython versions
+
+### arrayblit was added to bitmaptools after fill_region and draw_line
+_HAVE_ARRAYBLIT = bitmaptools is not None and hasattr(bitmaptools, "arrayblit")
+
 
 WRITE_COLOR = 0xe0e000
 WRITE_COLOR_DIM = 0x909020
@@ -42,10 +52,151 @@ READ_COLOR_DIM = 0x209090
 
 TEXT_COLOR = 0xc0c0c0
 
+### The value ranges for CircuitPython and MicroPython
+_UNIT_RANGES = {"CP": 65536, "MP": 1024}
+
+
+def _draw_text(bitmap, text, x_centre, y_top, font, value):
+    """Draw text horizontally centred on x_centre with the top of the font
+       at y_top by copying set pixels from the font's glyphs as value.
+       Text is kept inside the bitmap horizontally and clipped vertically."""
+    ### pylint: disable=too-many-locals
+    glyphs = [glyph for glyph in (font.get_glyph(ord(char)) for char in text)
+              if glyph is not None]
+    text_width = sum(glyph.shift_x for glyph in glyphs)
+    x_pos = min(max(0, x_centre - text_width // 2), bitmap.width - text_width)
+    font_bb = _font_bb(font)
+    baseline = y_top + font_bb[1] + (font_bb[3] if len(font_bb) > 3 else 0)
+
+    for glyph in glyphs:
+        if glyph.width:
+            ### Glyphs may be tiles in a larger bitmap, e.g. terminalio.FONT
+            tiles_per_row = glyph.bitmap.width // glyph.width
+            src_x = glyph.tile_index % tiles_per_row * glyph.width
+            src_y = glyph.tile_index // tiles_per_row * glyph.height
+            dst_x = x_pos + glyph.dx
+            dst_y = baseline - glyph.height - glyph.dy
+            for g_y in range(glyph.height):
+                if not 0 <= dst_y + g_y < bitmap.height:
+                    continue
+                for g_x in range(glyph.width):
+                    if (glyph.bitmap[src_x + g_x, src_y + g_y]
+                            and 0 <= dst_x + g_x < bitmap.width):
+                        bitmap[dst_x + g_x, dst_y + g_y] = value
+        x_pos += glyph.shift_x
+
+
+### Analog scale bitmaps including labels keyed by their geometry and colour index
+_SCALE_BMP_CACHE = {}
+
+### Palettes keyed by (bg_color, line_color, scale_color)
+_PALETTE_CACHE = {}
+
+
+def _get_palette(bg_color, line_color, scale_color):
+    """Return a shared three colour Palette for the bar graph and wave objects
+       with background (transparent for None) at 0, line at 1 and scale at 2.
+       The returned Palette must not be modified."""
+    key = (bg_color, line_color, scale_color)
+    palette = _PALETTE_CACHE.get(key)
+    if palette is None:
+        palette = displayio.Palette(3)
+        if bg_color is None:
+            palette.make_transparent(0)
+        else:
+            palette[0] = bg_color
+        palette[1] = line_color
+        palette[2] = scale_color
+        _PALETTE_CACHE[key] = palette
+    return palette
+
+
+### Bounding boxes of fonts keyed by id() of the font
+_FONT_BB_CACHE = {}
+
+
+def _font_bb(font):
+    """Return the bounding box of the font, caching it as several
+       DisplayPin objects will typically share the same font."""
+    font_bb = _FONT_BB_CACHE.get(id(font))
+    if font_bb is None:
+        font_bb = font.get_bounding_box()
+        _FONT_BB_CACHE[id(font)] = font_bb
+    return font_bb
+
+
+### Text scale factors keyed by (id(font), height)
+_SCALE_FOR_HEIGHT = {}
+
+
+def _font_scale(font, height):
+    """Return the integer scale factor for the capitals of font to fit in height."""
+    key = (id(font), height)
+    scale = _SCALE_FOR_HEIGHT.get(key)
+    if scale is None:
+        ### 9//14 covers the height of capitals (no descenders)
+        scale = height // (_font_bb(font)[1] * 9 // 14)
+        _SCALE_FOR_HEIGHT[key] = scale
+    return scale
+
+
+def _fill_region(bitmap, x1, y1, x2, y2, value):
+    """Fill the rectangle from x1, y1 to x2 - 1, y2 - 1 with value
+       using bitmaptools if available or per-pixel writes if not."""
+    if bitmaptools is not None:
+        bitmaptools.fill_region(bitmap, x1, y1, x2, y2, value)
+    else:
+        for x_pos in range(x1, x2):
+            for y_pos in range(y1, y2):
+                bitmap[x_pos, y_pos] = value
+
+
+class _BatchUpdate:
+    """A context manager which turns off auto_refresh on display, refreshes it
+       once at the end if refresh is True and no exception was raised and
+       restores auto_refresh. Nothing is done if display is None or if
+       auto_refresh is already off to allow nesting."""
+
+    def __init__(self, display, refresh=True):
+        self._display = display
+        self._refresh = refresh
+        self._prev_auto_refresh = None
+
+    def __enter__(self):
+        if self._display is not None:
+            self._prev_auto_refresh = self._display.auto_refresh
+            self._display.auto_refresh = False
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._display is not None and self._prev_auto_refresh:
+            try:
+                if self._refresh and exc_type is None:
+                    self._display.refresh(minimum_frames_per_second=0)
+            finally:
+                self._display.auto_refresh = True
+        return False
+
+
+def batch_update(display):
+    """Return a context manager to group updates to the display into one refresh."""
+    return _BatchUpdate(display)
+
 
 class DisplayPin:
+    """A displayio Group showing the name of a pin and its state or value.
+
+       A display can be passed to allow the PWM wave to be redrawn without
+       an intermediate refresh. Updates to many DisplayPin objects can be
+       shown with a single refresh using:
+
+       with display_pin.batch_update(board.DISPLAY):
+           for dp_pin, pin in zip(dp_pins, pins):
+               dp_pin.value = pin.value
+       """
 
     _NAME_WIDTH = 3
+    _ANALOG_MODES = ("read_analog", "write_trueanalog")
 
 
     def __init__(self,
@@ -56,6 +207,7 @@ class DisplayPin:
                  width=120, height=18, font=terminalio.FONT,
                  label_color=TEXT_COLOR,
                  bg_color=None,  ### pylint: disable=unused-argument
+                 display=None,
                  ):
         ### pylint: disable=too-many-locals
         self._name = name
@@ -67,59 +219,32 @@ class DisplayPin:
         self._height = height
         self._scale = None
 
-        if self._units == "CP":
-            value_range = 65536
-        elif self._units == "MP":
-            value_range = 1024
-        else:
+        value_range = _UNIT_RANGES.get(self._units)
+        if value_range is None:
             raise ValueError("Unbelievable carelessness $USER: units must be CP or MP")
 
         self._dio_font = font
-        font_bb = self._dio_font.get_bounding_box()
-        ### 9//14 covers the height of capitals (no descenders)
-        scale = height // (font_bb[1] * 9 // 14)
+        font_bb = _font_bb(self._dio_font)
+        scale = _font_scale(self._dio_font, height)
         self._name_dob = adafruit_display_text.label.Label(text=name[:self._NAME_WIDTH].upper(),
                                                            font=self._dio_font,
                                                            color=label_color,
                                                            scale=scale)
         self._name_dob.y = (height - 1) // 2  ### positioning assume upper case
-        self._group = displayio.Group(max_size=3)
+        self._group = displayio.Group(max_size=2)
         self._group.append(self._name_dob)
 
-        font_bb = self._dio_font.get_bounding_box()
         label_width = self._NAME_WIDTH * scale * font_bb[0]
         gap = 4
         data_width = width - label_width - gap
         self._data_dob_pos = label_width + gap
 
-        if mode in ("read_analog", "write_trueanalog"):
-            labels = height >= 60
-            self._data = DisplayPinDataAnalog(data_width, height, mode=="write_trueanalog",
-                                              vref=vref, value_range=value_range,
-                                              labels=labels, font=self._dio_font)
-            self._data.group.x = self._data_dob_pos
-
-        elif mode in ("read_digital", "write_digital"):
-            self._data = DisplayPinDataDigital(data_width, height, mode=="write_digital",
-                                               vref=vref)
-            self._data.group.x = self._data_dob_pos
-
-        elif mode == "write_analog":  ### TODO - consider giving this an alias of "pwm"
-            self._data = DisplayPinDataPWM(data_width, height,
-                                           vref=vref, value_range=value_range)
-            self._data.group.x = self._data_dob_pos
-
-        elif mode == "touch":
-            self._data = DisplayPinDataTouch(data_width, height)
-            self._data.group.x = self._data_dob_pos
-
-        elif mode == "music_frequency":
-            self._data = DisplayPinDataMusic(data_width, height)
-            self._data.group.x = self._data_dob_pos
-
-        else:
-            self._data = None
-
+        self._vref = vref
+        self._value_range = value_range
+        self._data_width = data_width
+        self._display = display
+        self._data_pool = {}
+        self._data = self._allocateData(mode)
         if self._data:
             self._group.append(self._data.group)
 
@@ -148,8 +273,70 @@ class DisplayPin:
 
     @mode.setter
     def mode(self, new_mode):
+        """Change the mode keeping the data object for the old mode for reuse.
+           The value is reset to None, a reused data object is reset to show
+           no value and the value should be set after a mode change."""
+        if new_mode == self._mode:
+            return
+
+        if self._data is not None:
+            self._group.remove(self._data.group)
+            self._data_pool[self._poolKey(self._mode)] = self._data
+
         self._mode = new_mode
-        ### TODO - change mode and probably None out the _data
+        self._data = self._data_pool.pop(self._poolKey(new_mode), None)
+        if self._data is None:
+            self._data = self._allocateData(new_mode)
+        else:
+            self._data.reset()
+            if new_mode in self._ANALOG_MODES:
+                ### same bar graph just with different colours
+                self._data.output = new_mode == "write_trueanalog"
+        if self._data is not None:
+            self._group.append(self._data.group)
+
+        self._user_value = None
+
+
+    def _poolKey(self, mode):
+        """The key for _data_pool, the analog modes share a data object."""
+        return "analog" if mode in self._ANALOG_MODES else mode
+
+
+    def _allocateData(self, mode):
+        """Create the data object for mode or return None for an unknown mode."""
+        data_width = self._data_width
+        height = self._height
+        vref = self._vref
+        value_range = self._value_range
+        if mode in self._ANALOG_MODES:
+            labels = height >= 60
+            data = DisplayPinDataAnalog(data_width, height, mode=="write_trueanalog",
+                                        vref=vref, value_range=value_range,
+                                        labels=labels, font=self._dio_font)
+
+        elif mode in ("read_digital", "write_digital"):
+            data = DisplayPinDataBooleanText(data_width, height, mode=="write_digital",
+                                             vref=vref,
+                                             true_text="HIGH", false_text="low")
+
+        elif mode == "write_analog":  ### TODO - consider giving this an alias of "pwm"
+            data = DisplayPinDataPWM(data_width, height,
+                                     vref=vref, value_range=value_range,
+                                     display=self._display)
+
+        elif mode == "touch":
+            data = DisplayPinDataBooleanText(data_width, height,
+                                             true_text="Touch", false_text="-----")
+
+        elif mode == "music_frequency":
+            data = DisplayPinDataMusic(data_width, height)
+
+        else:
+            return None
+
+        data.group.x = self._data_dob_pos
+        return data
 
 
 class DisplayPinDataAnalog:
@@ -161,7 +348,8 @@ class DisplayPinDataAnalog:
 
     def _makeLine(self, width, height, col_idx):
         line = displayio.Bitmap(width, height, len(self._palette))
-        line.fill(col_idx)
+        if col_idx != 0:  ### new Bitmap is already all zeros
+            line.fill(col_idx)
         tg = displayio.TileGrid(line, pixel_shader=self._palette)
         return tg
 
@@ -170,53 +358,50 @@ class DisplayPinDataAnalog:
                    label_height=None, font=None):
         ### pylint: disable=too-many-locals,too-many-branches
         scale_height = height - label_height if label_height else height
-        scale_line = displayio.Bitmap(width, scale_height, len(self._palette))
+        ### The scale bitmap including any labels is shared by all objects
+        ### with the same geometry
+        bmp_key = (width, height, vref, tick_width, col_idx, len(self._palette),
+                   label_height, id(font) if label_height else None)
+        scale_line = _SCALE_BMP_CACHE.get(bmp_key)
+        if scale_line is not None:
+            return displayio.TileGrid(scale_line, pixel_shader=self._palette)
+
+        scale_line = displayio.Bitmap(width, height, len(self._palette))
         scale_bottom_row = scale_height - 1
         tick_ratio = 5
+        ### Integer arithmetic in millivolts for the tick positions
+        scfactor = self._scale_scfactor
+        vref_mv = round(vref * 1000)
 
-        labels = []
         major_ticks = list(range(0, int(vref) + 1))
         if major_ticks[-1] != vref:
             major_ticks.append(vref)
         for idx, major_tick in enumerate(major_ticks):
-            x_pos = int(major_tick / vref * self._scale_scfactor)
+            x_pos = round(major_tick * 1000) * scfactor // vref_mv
 
             ### Thicken first and last
             if idx == 0:
-                x_range = range(tick_width + 1)
+                x0, x1 = 0, tick_width + 1
             elif idx == len(major_ticks) - 1:
-                x_range = range(-1, tick_width)
+                x0, x1 = -1, tick_width
             else:
-                x_range = range(tick_width)
-            for t_off_x in x_range:
-                for t_row in range(scale_height):
-                    scale_line[x_pos + t_off_x, t_row] = col_idx
+                x0, x1 = 0, tick_width
+            _fill_region(scale_line, x_pos + x0, 0, x_pos + x1, scale_height, col_idx)
 
+            ### Labels are drawn into the bitmap rather than using a Label
+            ### per tick to keep the number of displayio objects down
             if label_height and major_tick == int(major_tick):
-                lab = adafruit_display_text.label.Label(text=str(major_tick),
-                                                        font=font,
-                                                        color=self._palette[col_idx],
-                                                        anchor_point=(0.5, 0),  ### North
-                                                        anchored_position=(x_pos +1,
-                                                                           scale_height),
-                                                        )
-                labels.append(lab)
+                _draw_text(scale_line, str(major_tick), x_pos + 1, scale_height,
+                           font, col_idx)
 
         for minor_tick in range(0, int(vref * tick_ratio) + 1):
-            x_pos = int(minor_tick * self._scale_scfactor / (vref * tick_ratio))
-            for t_off_x in range(tick_width):
-                scale_line[x_pos + t_off_x, scale_bottom_row] = col_idx
+            x_pos = minor_tick * scfactor * 1000 // (vref_mv * tick_ratio)
+            _fill_region(scale_line, x_pos, scale_bottom_row,
+                         x_pos + tick_width, scale_bottom_row + 1, col_idx)
 
-        tg = displayio.TileGrid(scale_line, pixel_shader=self._palette)
-        if labels:
-            group = displayio.Group(max_size=len(labels) + 1)
-            for label in labels:
-                group.append(label)
-            group.append(tg)
-        else:
-            group = tg
-
-        return group
+        ### Only cached when complete to avoid sharing a partially drawn scale
+        _SCALE_BMP_CACHE[bmp_key] = scale_line
+        return displayio.TileGrid(scale_line, pixel_shader=self._palette)
 
 
     def __init__(self, width=100, height=18, output=False,
@@ -226,30 +411,21 @@ class DisplayPinDataAnalog:
                  line_width=2, tick_width=1,
                  line_color=None, scale_color=None, bg_color=None):
         ### pylint: disable=too-many-locals
-        self._palette = displayio.Palette(3)
-        if bg_color is None:
-            self._palette.make_transparent(0)
-        else:
-            self._palette[0] = bg_color
-
-        if line_color is None:
-            self._palette[self._LINE_COL_IDX] = WRITE_COLOR if output else READ_COLOR
-        else:
-            self._palette[self._LINE_COL_IDX] = line_color
-
-        if scale_color is None:
-            self._palette[self._SCALE_COL_IDX] = WRITE_COLOR_DIM if output else READ_COLOR_DIM
-        else:
-            self._palette[self._SCALE_COL_IDX] = scale_color
+        self._line_color = line_color
+        self._scale_color = scale_color
+        self._bg_color = bg_color
+        self._palette = self._getPalette(output)
 
         self._line_scfactor = width - line_width
         self._scale_scfactor = width - tick_width
         self._value_range = value_range
+        self._max_value = value_range - 1
         self._labels = labels
         self._font = font
 
-        label_height = font.get_bounding_box()[1] if labels and font else 0
+        label_height = _font_bb(font)[1] if labels and font else 0
         scale_height = 5
+        ### Moving this small TileGrid only refreshes its old and new areas
         self._bargraph_line_dob = self._makeLine(line_width,
                                                  height - scale_height - label_height - 1,
                                                  self._LINE_COL_IDX)
@@ -271,6 +447,31 @@ class DisplayPinDataAnalog:
             self.value = value
 
 
+    def _getPalette(self, output):
+        line_color = self._line_color
+        if line_color is None:
+            line_color = WRITE_COLOR if output else READ_COLOR
+        scale_color = self._scale_color
+        if scale_color is None:
+            scale_color = WRITE_COLOR_DIM if output else READ_COLOR_DIM
+        return _get_palette(self._bg_color, line_color, scale_color)
+
+
+    @property
+    def output(self):
+        return self._output
+
+    @output.setter
+    def output(self, output):
+        """Change between input and output colours reusing the bitmaps."""
+        if self._output == output:
+            return
+        self._output = output
+        self._palette = self._getPalette(output)
+        self._bargraph_line_dob.pixel_shader = self._palette
+        self._bargraph_scale_dob.pixel_shader = self._palette
+
+
     def _setLinePos(self, value):
         if value is None:
             return
@@ -285,18 +486,17 @@ class DisplayPinDataAnalog:
 
     @value.setter
     def value(self, value):
-        if value is None:
-            c_value = value
-        elif value < 0:
-            c_value = 0
-        elif value >= self._value_range:
-            c_value = self._value_range - 1
-        else:
-            c_value = value
+        c_value = None if value is None else min(self._max_value, max(0, value))
         self._value = c_value
         self._setLinePos(c_value)
 
 
+    def reset(self):
+        """Return to the state after construction with no value and the bar at 0."""
+        self._value = None
+        self._bargraph_line_dob.x = 0
+
+
     @property
     def group(self):
         return self._group
@@ -322,11 +522,8 @@ class DisplayPinDataPWM:
         ticks = 5  ### (0%, 25%, 50%, 75%, 100%)
 
         for idx, major_tick in enumerate(range(0, ticks)):
-            x_pos = int(major_tick / (ticks - 1) * self._scale_scfactor)
-
-            for t_off_x in range(tick_width):
-                for t_row in range(height):
-                    scale_line[x_pos + t_off_x, t_row] = col_idx
+            x_pos = major_tick * self._scale_scfactor // (ticks - 1)
+            _fill_region(scale_line, x_pos, 0, x_pos + tick_width, height, col_idx)
 
         tg = displayio.TileGrid(scale_line, pixel_shader=self._palette)
         return (tg, scale_line)
@@ -336,35 +533,31 @@ class DisplayPinDataPWM:
                  value=None, value_range=65536,
                  vref=3.3,
                  line_width=1, tick_width=1,
-                 line_color=None, scale_color=None, bg_color=None):
-        self._palette = displayio.Palette(3)
-        if bg_color is None:
-            self._palette.make_transparent(0)
-        else:
-            self._palette[0] = bg_color
-
+                 line_color=None, scale_color=None, bg_color=None,
+                 display=None):
         if line_color is None:
-            self._palette[self._LINE_COL_IDX] = WRITE_COLOR
-        else:
-            self._palette[self._LINE_COL_IDX] = line_color
-
+            line_color = WRITE_COLOR
         if scale_color is None:
-            self._palette[self._SCALE_COL_IDX] = WRITE_COLOR_DIM
-        else:
-            self._palette[self._SCALE_COL_IDX] = scale_color
+            scale_color = WRITE_COLOR_DIM
+        self._palette = _get_palette(bg_color, line_color, scale_color)
 
         self._line_scfactor = width - line_width
         self._scale_scfactor = width - tick_width
         self._value_range = value_range
+        self._max_value = value_range - 1
+        self._display = display
         scale_height = 3
         self._cycle_wave_width = width
         self._cycle_wave_height = height - scale_height - 3
         self._cycle_wave_dob, self._cycle_wave_bitmap = self._makeBlankWave(self._cycle_wave_width,
                                                                             self._cycle_wave_height)
+        ### A pre-made column and row of pixels for the edges and rails of the wave
+        self._col = array.array("B", [self._LINE_COL_IDX] * self._cycle_wave_height)
+        self._rail_full = array.array("B", [self._LINE_COL_IDX] * self._cycle_wave_width)
         self._cycle_scale_dob, _ = self._makeScale(tick_width, width, scale_height,
                                                    self._SCALE_COL_IDX)
         self._cycle_scale_dob.y = height - scale_height
-        self._cycle_scale_x_pos = self._waveXPos(value)
+        self._cycle_scale_x_pos = None  ### blank wave bitmap
 
         self._group = displayio.Group(max_size=2)
         self._group.append(self._cycle_scale_dob)
@@ -391,48 +584,73 @@ class DisplayPinDataPWM:
             return int((self._line_scfactor + 1) * value / self._value_range)
 
 
-    def _redrawWave(self, value):
-        """Draw one cycle of the square wave to show the duty cycle of the
-           pulse-width modulation output.
-           Special values are 0 for low output and
-           65535 for CircuitPython high output.
-           """
-        ##tg_bmp = self._group.pop()  ### Prevent redraw during modification
-
-        ### Calculate new x position and proceed no further if already there
-        negedge_x = self._waveXPos(value)
-        if negedge_x == self._cycle_scale_x_pos:
-            return
+    def _drawVLine(self, bmp, x_pos, y1, y2):
+        """Draw a vertical line in the line colour from y1 to y2 - 1."""
+        ### A strided memoryview slice over the Bitmap is not used as the
+        ### buffer packs pixels into bits_per_value bits with rows padded
+        ### to 32 bits, it is not one byte per pixel
+        if _HAVE_ARRAYBLIT:
+            bitmaptools.arrayblit(bmp, self._col, x_pos, y1, x_pos + 1, y2)
         else:
-            self._cycle_scale_x_pos = negedge_x
+            _fill_region(bmp, x_pos, y1, x_pos + 1, y2, self._LINE_COL_IDX)
 
-        bmp = self._cycle_wave_bitmap
-        bmp.fill(0)  ### clear it
 
-        if value is None:
+    def _drawHLine(self, bmp, x1, x2, y_pos):
+        """Draw a horizontal line in the line colour from x1 to x2 - 1."""
+        if x2 <= x1:
             return
+        if _HAVE_ARRAYBLIT:
+            ### arrayblit only uses the first x2 - x1 values from the row
+            bitmaptools.arrayblit(bmp, self._rail_full, x1, y_pos, x2, y_pos + 1)
+        else:
+            _fill_region(bmp, x1, y_pos, x2, y_pos + 1, self._LINE_COL_IDX)
+
 
+    def _drawWave(self, bmp, negedge_x):
+        """Draw the wave on the blank bitmap with the negative edge at negedge_x."""
+        width = self._cycle_wave_width
+        height = self._cycle_wave_height
         if negedge_x in ("low", "high"):
-            y_level = 0 if negedge_x == "high" else self._cycle_wave_height - 1
-            for x_pos in range(self._cycle_wave_width):
-                bmp[x_pos, y_level] = self._LINE_COL_IDX
+            y_level = 0 if negedge_x == "high" else height - 1
+            self._drawHLine(bmp, 0, width, y_level)
 
         else:
             top_y = 0
 
-            for y_pos in range(top_y, self._cycle_wave_height):
-                bmp[0, y_pos] = self._LINE_COL_IDX  ### up, rising edge
+            self._drawVLine(bmp, 0, top_y, height)  ### up, rising edge
 
-            for x_pos in range(1, negedge_x):
-                bmp[x_pos, top_y] = self._LINE_COL_IDX  ### top across
+            ### top across
+            self._drawHLine(bmp, 1, negedge_x, top_y)
 
             if negedge_x != 0:  ### rising edge covers x==0
-                for y_pos in range(top_y, self._cycle_wave_height):
-                    bmp[negedge_x, y_pos] = self._LINE_COL_IDX  ### down
+                self._drawVLine(bmp, negedge_x, top_y, height)  ### down
 
             ### bottom across
-            for x_pos in range(negedge_x + 1, self._cycle_wave_width):
-                bmp[x_pos, self._cycle_wave_height - 1] = self._LINE_COL_IDX
+            self._drawHLine(bmp, negedge_x + 1, width, height - 1)
+
+
+    def _redrawWave(self, value):
+        """Draw one cycle of the square wave to show the duty cycle of the
+           pulse-width modulation output.
+           Special values are 0 for low output and
+           65535 for CircuitPython high output.
+           """
+        ##tg_bmp = self._group.pop()  ### Prevent redraw during modification
+
+        ### Calculate new x position and proceed no further if already there
+        negedge_x = self._waveXPos(value)
+        if negedge_x == self._cycle_scale_x_pos:
+            return
+        else:
+            self._cycle_scale_x_pos = negedge_x
+
+        ### The display is not refreshed during the multiple changes, the
+        ### background auto_refresh shows the result afterwards
+        with _BatchUpdate(self._display, refresh=False):
+            bmp = self._cycle_wave_bitmap
+            bmp.fill(0)  ### clear it
+            if value is not None:
+                self._drawWave(bmp, negedge_x)
 
         ##self._group.append(tg_bmp)  ### Restore the TileGrid holding bitmap
 
@@ -443,36 +661,32 @@ class DisplayPinDataPWM:
 
     @value.setter
     def value(self, value):
-        if value is None:
-            c_value = value
-        elif value < 0:
-            c_value = 0
-        elif value >= self._value_range:
-            c_value = self._value_range - 1
-        else:
-            c_value = value
+        c_value = None if value is None else min(self._max_value, max(0, value))
         if self._value != c_value:
             self._value = c_value
             self._redrawWave(c_value)
 
 
+    def reset(self):
+        """Return to the state after construction with no value and no wave."""
+        self._value = None
+        self._redrawWave(None)
+
+
     @property
     def group(self):
         return self._group
 
 
 class DisplayPinDataBooleanText:
-    """A base class for anything that's boolean using a text representation."""
-
-    _FALSE_TEXT = "False"
-    _TRUE_TEXT = "True"
-    _TEXT_MAXLEN = max(len(_FALSE_TEXT), len(_TRUE_TEXT))
-    ### TODO - max length may be better set here
+    """Anything that's boolean using a text representation,
+       e.g. low or HIGH for digital and ----- or Touch for touch."""
 
     def __init__(self, width=100, height=18, output=False,
                  vref=3.3,
                  value=None, value_range=65536,
-                 font=terminalio.FONT, text_color=None, bg_color=None):
+                 font=terminalio.FONT, text_color=None, bg_color=None,
+                 true_text="True", false_text="False"):
 
         if text_color is None:
             digstate_color = WRITE_COLOR if output else READ_COLOR
@@ -480,13 +694,14 @@ class DisplayPinDataBooleanText:
             digstate_color = text_color
 
         self._dio_font = font
-        font_bb = self._dio_font.get_bounding_box()
-        scale = height // (font_bb[1] * 9 // 14)
+        scale = _font_scale(self._dio_font, height)
 
         self._value_range = value_range
+        self._true_text = true_text
+        self._false_text = false_text
         self._digstate_dob = adafruit_display_text.label.Label(text="",
-                                                               max_glyphs=max(len(self._FALSE_TEXT),
-                                                                              len(self._TRUE_TEXT)),
+                                                               max_glyphs=max(len(false_text),
+                                                                              len(true_text)),
                                                                font=self._dio_font,
                                                                color=digstate_color,
                                                                background_color=bg_color,
@@ -494,6 +709,7 @@ class DisplayPinDataBooleanText:
         self._digstate_dob.y = (height - 1) // 2
         self._group = displayio.Group(max_size=1)
         self._group.append(self._digstate_dob)
+        self._last_text = ""
 
         self._vref = vref
         self._output = output
@@ -505,9 +721,14 @@ class DisplayPinDataBooleanText:
 
     def _setDigstate(self, value):
         if value is None:
-            self._digstate_dob.text = ""
+            text = ""
         else:
-            self._digstate_dob.text = self._TRUE_TEXT if value else self._FALSE_TEXT
+            text = self._true_text if value else self._false_text
+        ### Avoid the relayout of the Label if the text is unchanged
+        if text == self._last_text:
+            return
+        self._last_text = text
+        self._digstate_dob.text = text
 
 
     @property
@@ -522,27 +743,17 @@ class DisplayPinDataBooleanText:
             self._setDigstate(new_value)
 
 
+    def reset(self):
+        """Return to the state after construction with no value and no text."""
+        self._value = None
+        self._setDigstate(None)
+
+
     @property
     def group(self):
         return self._group
 
 
-class DisplayPinDataDigital(DisplayPinDataBooleanText):
-    """A text low or HIGH."""
-
-    _FALSE_TEXT = "low"
-    _TRUE_TEXT = "HIGH"
-    _TEXT_MAXLEN = max(len(_FALSE_TEXT), len(_TRUE_TEXT))
-
-
-class DisplayPinDataTouch(DisplayPinDataBooleanText):
-    """Text with ----- or touch."""
-
-    _FALSE_TEXT = "-----"
-    _TRUE_TEXT = "Touch"
-    _TEXT_MAXLEN = max(len(_FALSE_TEXT), len(_TRUE_TEXT))
-
-
 class DisplayPinDataMusic:
     """A note name as a string or frequency as a number."""
     def __init__(self, width=100, height=18, output=True,
@@ -555,8 +766,7 @@ class DisplayPinDataMusic:
             note_color = text_color
 
         self._dio_font = font
-        font_bb = self._dio_font.get_bounding_box()
-        scale = height // (font_bb[1] * 18 // 28)
+        scale = _font_scale(self._dio_font, height)
 
         self._value_range = value_range
         self._note_dob = adafruit_display_text.label.Label(text="",
@@ -568,6 +778,7 @@ class DisplayPinDataMusic:
         self._note_dob.y = (height - 1) // 2
         self._group = displayio.Group(max_size=1)
         self._group.append(self._note_dob)
+        self._last_rounded = None
 
         self._value = None
         if value is not None:
@@ -576,14 +787,21 @@ class DisplayPinDataMusic:
 
     def _setNote(self, value):
         if value is None:
+            self._last_rounded = None
             self._note_dob.text = ""
         elif isinstance(value, str):
+            self._last_rounded = None
             parts = value.split(":")
             self._note_dob.text = parts[0]
         else:
+            ### Frequencies which round to the same value leave the text alone
+            rounded = round(value)
+            if rounded == self._last_rounded:
+                return
+            self._last_rounded = rounded
             ### TODO - this is 7 chars - maybe truncate to first 5 or 6 to keep shorter if needed
             ### and based on a dynamic value?
-            self._note_dob.text = "{:d}Hz".format(round(value))
+            self._note_dob.text = "%dHz" % rounded
             ##self._note_dob.text = "{:.1f}Hz".format(value)
             ##self._note_dob.text = "{:d}".format(round(value))
 
@@ -604,6 +822,12 @@ class DisplayPinDataMusic:
             self._setNote(text_value)
 
 
+    def reset(self):
+        """Return to the state after construction with no value and no text."""
+        self._value = None
+        self._setNote(None)
+
+
     @property
     def group(self):
         return self._group